@@ -0,0 +1,322 @@
+"""Media to text transcription shared by the GUI and the command line."""
+
+import json
+import os
+import subprocess
+import sys
+import wave
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import suppress
+from functools import partial
+from io import BufferedIOBase
+from itertools import cycle
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from queue import Empty, Queue, SimpleQueue
+from threading import BoundedSemaphore, Event, Lock, Thread
+
+import numpy as np
+from imageio_ffmpeg import get_ffmpeg_exe
+from vosk import KaldiRecognizer, Model
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK_SIZE = 4000 * SAMPLE_WIDTH
+READ_SIZE = 1 << 15
+QUEUE_SIZE = 8
+PIPE_SIZE = 1 << 20
+MODEL_PATH = Path("model")
+
+# Silence-aligned sharding: 30 ms frames, cut after 0.5 s pauses near 60 s
+FRAME_SIZE = 480 * SAMPLE_WIDTH
+SILENCE_THRESHOLD = 500
+MIN_SILENCE_FRAMES = 17
+SHARD_SIZE = 60 * SAMPLE_RATE * SAMPLE_WIDTH
+MAX_SHARD_SIZE = 2 * SHARD_SIZE
+MAX_SHARDS_IN_FLIGHT = 2 * (os.cpu_count() or 1)
+
+_models: dict[Path, Model] = {}
+_models_lock = Lock()
+_recognizers: dict[Model, SimpleQueue[KaldiRecognizer]] = {}
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+class CancelledError(Exception):
+    """Raised when a transcription is stopped through its cancel event."""
+
+
+def get_model(path: Path = MODEL_PATH) -> Model:
+    """Load a Vosk model once per process and return the cached instance."""
+    with _models_lock:
+        if path not in _models:
+            _models[path] = Model(str(path))
+        return _models[path]
+
+
+def acquire_recognizer(model: Model) -> KaldiRecognizer:
+    """Reuse an idle recognizer or create one for the model."""
+    try:
+        return _recognizers.setdefault(model, SimpleQueue()).get_nowait()
+    except Empty:
+        rec = KaldiRecognizer(model, SAMPLE_RATE)
+    # Only the plain text is used: skip word timings and alternatives
+    rec.SetWords(False)  # noqa: FBT003
+    rec.SetPartialWords(False)  # noqa: FBT003
+    rec.SetMaxAlternatives(0)
+    return rec
+
+
+def silent_frames(pcm: bytearray, start: int, count: int) -> np.ndarray:
+    """Flag which of the next count frames of pcm are below the RMS threshold."""
+    samples = np.frombuffer(pcm, np.int16, count * FRAME_SIZE // SAMPLE_WIDTH, start)
+    frames = samples.reshape(count, FRAME_SIZE // SAMPLE_WIDTH)
+    power = np.square(frames, dtype=np.float32).mean(axis=1)
+    return power < SILENCE_THRESHOLD**2
+
+
+def silence_runs(quiet: np.ndarray, carry: int) -> np.ndarray:
+    """Length of the silent run ending at each frame, continuing from carry."""
+    frames = np.arange(1, len(quiet) + 1)
+    last_loud = np.maximum.accumulate(np.where(quiet, 0, frames))
+    return frames - last_loud + np.where(last_loud == 0, carry, 0)
+
+
+def find_pcm_data(path: Path) -> tuple[int, int] | None:
+    """Locate the data chunk of a WAV file that is already 16 kHz mono s16le."""
+    if path.suffix.lower() != ".wav":
+        return None
+    try:
+        # Let the wave module validate the header (PCM only)
+        with wave.open(str(path), "rb") as wf:
+            params = wf.getframerate(), wf.getnchannels(), wf.getsampwidth()
+        if params != (SAMPLE_RATE, 1, SAMPLE_WIDTH):
+            return None
+        with path.open("rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+            pos = 12
+            while pos + 8 <= len(mm):
+                size = int.from_bytes(mm[pos + 4 : pos + 8], "little")
+                if mm[pos : pos + 4] == b"data":
+                    # Streaming writers may leave the size at 0: use the file
+                    available = len(mm) - pos - 8
+                    return pos + 8, min(size, available) if size else available
+                pos += 8 + size + (size & 1)
+    except (OSError, EOFError, ValueError, wave.Error):
+        return None
+    return None
+
+
+def split_on_silence(chunks: Iterable[memoryview]) -> Iterator[bytes]:
+    """Cut a PCM stream into roughly minute-long shards at pauses in speech."""
+    pending = bytearray()
+    scanned = 0
+    silent = 0
+    for chunk in chunks:
+        pending += chunk
+        while count := (len(pending) - scanned) // FRAME_SIZE:
+            runs = silence_runs(silent_frames(pending, scanned, count), silent)
+            ends = scanned + FRAME_SIZE * np.arange(1, count + 1)
+            cuts = np.flatnonzero(
+                ((ends >= SHARD_SIZE) & (runs >= MIN_SILENCE_FRAMES))
+                | (ends >= MAX_SHARD_SIZE),
+            )
+            if not cuts.size:
+                scanned = int(ends[-1])
+                silent = int(runs[-1])
+                break
+            # Cut in the middle of the pause
+            scanned = int(ends[cuts[0]])
+            cut = scanned - int(runs[cuts[0]]) * FRAME_SIZE // 2
+            yield bytes(pending[:cut])
+            del pending[:cut]
+            scanned -= cut
+            silent = 0
+    if pending:
+        yield bytes(pending)
+
+
+def enlarge_pipe(pipe: BufferedIOBase) -> None:
+    """Grow the decoder pipe on Linux so ffmpeg blocks less often."""
+    if sys.platform != "linux":
+        return
+    import fcntl  # noqa: PLC0415
+
+    with suppress(OSError):
+        fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+
+
+def read_pcm(stream: BufferedIOBase, chunks: Queue) -> None:
+    """Read PCM from the decoder into the queue."""
+    # A slot is only reused once the queue and the consumer are past it
+    ring = [memoryview(bytearray(READ_SIZE)) for _ in range(QUEUE_SIZE + 2)]
+    for buf in cycle(ring):
+        size = stream.readinto(buf)
+        if not size:
+            break
+        chunks.put(buf[:size])
+
+
+def read_wav(path: Path, data: tuple[int, int], chunks: Queue) -> None:
+    """Read the PCM payload of a WAV file through mmap into the queue."""
+    offset, size = data
+    with path.open("rb") as f, mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+        for start in range(offset, offset + size, READ_SIZE):
+            chunks.put(mm[start : min(start + READ_SIZE, offset + size)])
+
+
+def recognize(pcm: bytes, model: Model) -> str:
+    """Feed a 16 kHz mono PCM shard through its own Vosk recognizer."""
+    rec = acquire_recognizer(model)
+    results = []
+    for start in range(0, len(pcm), CHUNK_SIZE):
+        if rec.AcceptWaveform(pcm[start : start + CHUNK_SIZE]):
+            results.append(json.loads(rec.Result())["text"])  # noqa: PERF401
+    results.append(json.loads(rec.FinalResult())["text"])
+    # FinalResult resets the decoder, so the recognizer can be reused
+    _recognizers[model].put(rec)
+    return " ".join(filter(None, results))
+
+
+def check_cancel(cancel: Event | None) -> None:
+    """Raise CancelledError once cancel is set."""
+    if cancel is not None and cancel.is_set():
+        raise CancelledError
+
+
+def recognize_shards(
+    chunks: Iterable[memoryview],
+    model: Model,
+    cancel: Event | None = None,
+) -> list[str]:
+    """Recognize silence-aligned shards of a PCM stream on all cores."""
+    in_flight = BoundedSemaphore(MAX_SHARDS_IN_FLIGHT)
+    shards = []
+    texts = []
+    try:
+        # Hold back the decoder while enough shards wait for a recognizer
+        for shard in split_on_silence(chunks):
+            while not in_flight.acquire(timeout=0.1):
+                check_cancel(cancel)
+            check_cancel(cancel)
+            future = _executor.submit(recognize, shard, model)
+            future.add_done_callback(lambda _: in_flight.release())
+            shards.append(future)
+        for future in shards:
+            while not future.done():
+                check_cancel(cancel)
+                wait([future], timeout=0.1)
+            texts.append(future.result())
+    except Exception:
+        # Drop the shards that have not started yet
+        for future in shards:
+            future.cancel()
+        raise
+    return texts
+
+
+def recognize_stream(
+    read: Callable[[Queue], None],
+    model: Model,
+    stop: Callable[[], object] | None = None,
+    cancel: Event | None = None,
+) -> str:
+    """Recognize PCM produced by read in a separate thread."""
+    chunks = Queue(maxsize=QUEUE_SIZE)
+    errors: list[Exception] = []
+
+    def produce() -> None:
+        # Keep a read error for the caller instead of ending the stream quietly
+        try:
+            read(chunks)
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+        finally:
+            chunks.put(None)
+
+    producer = Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        texts = recognize_shards(iter(chunks.get, None), model, cancel)
+    except Exception:
+        # Stop the source and unblock the producer
+        if stop is not None:
+            stop()
+        while producer.is_alive():
+            with suppress(Empty):
+                chunks.get(timeout=0.1)
+        raise
+    finally:
+        producer.join()
+    if errors:
+        # The stream ended early; stop the source before reporting it
+        if stop is not None:
+            stop()
+        raise errors[0]
+    return " ".join(filter(None, texts))
+
+
+def transcribe_with_ffmpeg(
+    path: Path,
+    model: Model,
+    cancel: Event | None = None,
+) -> str:
+    """Decode the media straight to 16 kHz mono PCM and recognize it."""
+    cmd = [
+        get_ffmpeg_exe(),
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-i",
+        str(path),
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-f",
+        "s16le",
+        "-",
+    ]
+    proc = subprocess.Popen(  # noqa: S603
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        bufsize=PIPE_SIZE,
+    )
+    enlarge_pipe(proc.stdout)
+
+    # Feed the PCM stream to the recognizer
+    with proc:
+        text = recognize_stream(
+            partial(read_pcm, proc.stdout),
+            model,
+            proc.kill,
+            cancel,
+        )
+    if proc.returncode:
+        msg = f"ffmpeg exited with code {proc.returncode}"
+        raise RuntimeError(msg)
+    return text
+
+
+def transcribe(path: Path, model: Model, cancel: Event | None = None) -> str:
+    """Transcribe a media file with the given Vosk model.
+
+    Setting cancel stops the decoder and raises CancelledError.
+    """
+    if (data := find_pcm_data(path)) is not None:
+        # Already 16 kHz mono PCM, read it in place
+        return recognize_stream(partial(read_wav, path, data), model, cancel=cancel)
+    return transcribe_with_ffmpeg(path, model, cancel)
+
+
+def main() -> None:
+    """Print the transcript of each media file given on the command line."""
+    model = get_model()
+    for arg in sys.argv[1:]:
+        print(transcribe(Path(arg), model))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
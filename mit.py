@@ -1,18 +1,28 @@
 """Video to text converter with GUI."""
 
 import os
+import subprocess
+import sys
 import tkinter as tk
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import suppress
 from pathlib import Path
-from threading import Thread
+from threading import Event, Thread
 from tkinter import filedialog, messagebox, ttk
 
-from moviepy import AudioFileClip
-from speech_recognition import AudioFile, Recognizer
+from core import MODEL_PATH, check_cancel, get_model, transcribe
+
+MAX_FILE_WORKERS = 4
+WRITE_BUFFER_SIZE = 1 << 20
 
 
 class VideoToTextConverter:
     """GUI for media to text conversion."""
 
+    model_path = MODEL_PATH
+
     def __init__(self, root: tk.Tk) -> None:
         """Initialize the GUI."""
         self.root = root
@@ -21,13 +31,18 @@ class VideoToTextConverter:
         self.root.geometry(f"{int(width/4)}x{int(height/4)}")
         self.root.resizable(width=False, height=False)
         self.root.title("Media to Text Converter")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         # Variable
-        self.selected_file = None
-        self.output_file = None
+        self.selected_files: list[Path] = []
+        self.output_files: list[Path] = []
+        self.batch_cancel: Event | None = None
 
         self.setup_ui()
 
+        # Load the model in the background while the user picks a file
+        Thread(target=self.load_model, daemon=True).start()
+
     def setup_ui(self) -> None:
         """Set up the UI components."""
         # Main frame
@@ -43,7 +58,7 @@ class VideoToTextConverter:
         title_label.grid(row=0, column=0, columnspan=2, pady=(0, 10))
 
         # File selection
-        ttk.Label(main_frame, text="Select media file:").grid(
+        ttk.Label(main_frame, text="Select media files:").grid(
             row=1,
             column=0,
             sticky=tk.W,
@@ -90,26 +105,31 @@ class VideoToTextConverter:
         file_frame.columnconfigure(0, weight=1)
 
     def browse_file(self) -> None:
-        """Open file dialog to select media file."""
+        """Open file dialog to select one or more media files."""
         file_types = [
             ("Media files", "*.mp4 *.avi *.mov *.mkv *.mp3 *.wav *.ogg"),
             ("All files", "*.*"),
         ]
 
-        filename = filedialog.askopenfilename(
-            title="Select media File",
+        filenames = filedialog.askopenfilenames(
+            title="Select media Files",
             filetypes=file_types,
         )
 
-        if filename:
-            self.selected_file = Path(filename)
-            self.file_label.config(text=self.selected_file.name, foreground="black")
-            self.output_file = None
+        if filenames:
+            self.selected_files = [Path(filename) for filename in filenames]
+            label = (
+                self.selected_files[0].name
+                if len(self.selected_files) == 1
+                else f"{len(self.selected_files)} files selected"
+            )
+            self.file_label.config(text=label, foreground="black")
+            self.output_files = []
             self.start_conversion()
 
     def start_conversion(self) -> None:
         """Start the conversion process in a separate thread."""
-        if not self.selected_file:
+        if not self.selected_files:
             messagebox.showerror("Error", "Please select a media file first.")
             return
 
@@ -117,55 +137,129 @@ class VideoToTextConverter:
         self.upload_btn.config(state="disabled")
 
         # Start progress bar
-        self.progress_label.config(text="Converting media to text...")
+        self.update_progress(0, "Converting media to text...")
 
         # Run conversion in separate thread to prevent GUI freezing
         thread = Thread(target=self.convert_media)
         thread.daemon = True
         thread.start()
 
+    def load_model(self) -> None:
+        """Load the Vosk model ahead of the first conversion."""
+        # A failed load is retried and reported by the conversion itself
+        with suppress(Exception):
+            get_model(self.model_path)
+
+    def post_progress(
+        self,
+        progress: dict[Path, float],
+        path: Path,
+        fraction: float,
+        text: str,
+    ) -> None:
+        """Record a file's progress and post the batch total to the main loop."""
+        progress[path] = fraction
+        total = sum(progress.values()) / len(progress)
+        self.post(self.update_progress, int(total * 100), text)
+
+    @staticmethod
+    def output_paths(files: list[Path]) -> dict[Path, Path]:
+        """Name each text file after its source, keeping the suffix on clashes."""
+        stems = Counter(path.with_suffix("") for path in files)
+        return {
+            path: path.with_suffix(".txt")
+            if stems[path.with_suffix("")] == 1
+            else path.with_name(f"{path.name}.txt")
+            for path in files
+        }
+
+    def convert_file(
+        self,
+        path: Path,
+        output_file: Path,
+        progress: dict[Path, float],
+        cancel: Event,
+    ) -> Path:
+        """Convert one media file to the given text file."""
+        # Decoding and recognition overlap, so they are one stage
+        self.post_progress(progress, path, 0.3, "Converting speech to text...")
+        text = transcribe(path, get_model(self.model_path), cancel)
+
+        # Save text to file, unless the batch was stopped meanwhile
+        check_cancel(cancel)
+        self.post_progress(progress, path, 0.9, "Saving text...")
+        with output_file.open("wb", buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(text.encode("utf-8"))
+        return output_file
+
+    @staticmethod
+    def file_result(future: Future[Path], path: Path) -> Path:
+        """Return a finished file's output, naming the file if it failed."""
+        try:
+            return future.result()
+        except Exception as e:
+            msg = f"{path.name}: {e}"
+            raise RuntimeError(msg) from e
+
     def convert_media(self) -> None:
-        """Convert media to text."""
+        """Convert the selected media files to text."""
         try:
-            # Load the media file. Extract/convert the audio
-            self.progress_bar.step(30)
-            self.root.after(
-                0,
-                lambda: self.progress_label.config(text="Extracting audio..."),
-            )
-            file = AudioFileClip(str(self.selected_file))
-            wav_filename = self.selected_file.parent / f"{self.selected_file.stem}.wav"
-            file.write_audiofile(str(wav_filename))
-            file.close()
-
-            # Initialize recognizer
-            self.progress_bar.step(30)
-            self.root.after(
-                0,
-                lambda: self.progress_label.config(text="Converting speech to text..."),
-            )
-            r = Recognizer()
-            with AudioFile(str(wav_filename)) as source:
-                data = r.record(source)
-                text = r.recognize_vosk(data)
-
-            # Save text to file
-            self.progress_bar.step(30)
-            self.output_file = (
-                self.selected_file.parent / f"{self.selected_file.stem}.txt"
-            )
-            with self.output_file.open("w", encoding="utf-8") as f:
-                f.write(text)
+            # Files share the cached model and the shard executor
+            files = self.selected_files
+            outputs = self.output_paths(files)
+            # Per-batch state: filled up front so workers only update values
+            progress = dict.fromkeys(files, 0.0)
+            cancel = self.batch_cancel = Event()
+            workers = min(MAX_FILE_WORKERS, os.cpu_count() or 1, len(files))
+            executor = ThreadPoolExecutor(max_workers=workers)
+            try:
+                futures = {
+                    executor.submit(
+                        self.convert_file,
+                        f,
+                        outputs[f],
+                        progress,
+                        cancel,
+                    ): f
+                    for f in files
+                }
+                for done, future in enumerate(as_completed(futures), start=1):
+                    self.file_result(future, futures[future])
+                    self.post_progress(
+                        progress,
+                        futures[future],
+                        1.0,
+                        f"Converted {done} of {len(files)} files...",
+                    )
+            finally:
+                # On failure, drop queued files and stop the running ones
+                # (killing their decoders) before reporting the outcome
+                cancel.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+            self.output_files = [future.result() for future in futures]
 
             # Update UI on completion
-            if wav_filename.exists():
-                wav_filename.unlink()
-            self.root.after(0, self.conversion_completed)
+            self.post(self.conversion_completed)
 
         except Exception as e:  # noqa: BLE001
             # Handle errors - capture the error message first
-            error_message = str(e)
-            self.root.after(0, lambda msg=error_message: self.conversion_failed(msg))
+            self.post(self.conversion_failed, str(e))
+
+    def post(self, callback: Callable[..., object], *args: object) -> None:
+        """Run callback on the Tk main loop; a closed window ignores it."""
+        with suppress(RuntimeError, tk.TclError):
+            self.root.after(0, callback, *args)
+
+    def close(self) -> None:
+        """Stop a running batch, killing its decoders, and close the window."""
+        if self.batch_cancel is not None:
+            self.batch_cancel.set()
+        self.root.destroy()
+
+    def update_progress(self, value: int, text: str) -> None:
+        """Update the progress bar and label from the Tk main loop."""
+        self.progress_bar["value"] = value
+        self.progress_label.config(text=text)
 
     def conversion_completed(self) -> None:
         """Handle successful conversion completion."""
@@ -175,7 +269,8 @@ class VideoToTextConverter:
         # Re-enable button
         self.upload_btn.config(state="normal")
 
-        messagebox.showinfo("Success", f"Text file saved as:\n{self.output_file.name}")
+        names = "\n".join(output_file.name for output_file in self.output_files)
+        messagebox.showinfo("Success", f"Text files saved as:\n{names}")
         self.open_folder()
         self.root.after(
             3000,
@@ -202,18 +297,22 @@ class VideoToTextConverter:
 
     def open_folder(self) -> None:
         """Open the folder containing the generated text file."""
-        if self.output_file and self.output_file.exists():
+        if self.output_files and self.output_files[0].exists():
             try:
-                # Get the parent directory of the output file
-                folder_path = self.output_file.parent
+                # Files picked in one dialog share the same directory
+                folder_path = self.output_files[0].parent
 
                 # Try to open folder with default system application
                 if os.name == "nt":  # Windows
                     os.startfile(folder_path)  # noqa: S606
-                elif os.name == "darwin":  # macOS
-                    os.system(f'open "{folder_path}"')  # noqa: S605
-                elif os.name == "posix":  # Linux
-                    os.system(f'xdg-open "{folder_path}"')  # noqa: S605
+                else:
+                    opener = "open" if sys.platform == "darwin" else "xdg-open"
+                    subprocess.Popen(  # noqa: S603
+                        [opener, str(folder_path)],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        start_new_session=True,
+                    )
             except OSError as e:
                 messagebox.showerror("Error", f"Could not open folder:\n{e}")
         else:
@@ -0,0 +1,172 @@
+"""Tests for the PCM pipeline in core."""
+
+import wave
+from pathlib import Path
+from queue import Queue
+from threading import Event
+
+import numpy as np
+import pytest
+
+import core
+from core import (
+    FRAME_SIZE,
+    MAX_SHARD_SIZE,
+    SAMPLE_RATE,
+    SAMPLE_WIDTH,
+    SHARD_SIZE,
+    CancelledError,
+    find_pcm_data,
+    recognize_stream,
+    silence_runs,
+    split_on_silence,
+)
+
+SECOND = SAMPLE_RATE * SAMPLE_WIDTH
+
+
+def speech(seconds: float) -> bytes:
+    """Loud square wave standing in for speech."""
+    samples = np.full(int(seconds * SAMPLE_RATE), 8000, np.int16)
+    samples[::2] = -8000
+    return samples.tobytes()
+
+
+def pause(seconds: float) -> bytes:
+    """Digital silence."""
+    return bytes(int(seconds * SAMPLE_RATE) * SAMPLE_WIDTH)
+
+
+def split(pcm: bytes, chunk_size: int) -> list[bytes]:
+    """Run split_on_silence over pcm fed in chunks of chunk_size bytes."""
+    view = memoryview(pcm)
+    chunks = (view[i : i + chunk_size] for i in range(0, len(pcm), chunk_size))
+    return list(split_on_silence(chunks))
+
+
+# Pauses at 50 s (too early to cut) and 71 s, then 130 s without a pause
+PCM = speech(50) + pause(1) + speech(20) + pause(1) + speech(130)
+
+
+def test_silence_runs_continue_from_carry() -> None:
+    quiet = np.array([True, True, False, True, True])
+    assert silence_runs(quiet, 3).tolist() == [4, 5, 0, 1, 2]
+    assert silence_runs(np.array([False, True]), 7).tolist() == [0, 1]
+
+
+def test_shards_round_trip() -> None:
+    assert b"".join(split(PCM, 1 << 15)) == PCM
+
+
+def test_cuts_in_pause_after_target_then_forces_at_max() -> None:
+    first, second, rest = split(PCM, 1 << 15)
+    # Cut in the middle of the second pause, after the 60 s target
+    assert SHARD_SIZE <= 71 * SECOND < len(first) < 72 * SECOND
+    assert PCM[len(first) - FRAME_SIZE : len(first) + FRAME_SIZE] == bytes(
+        2 * FRAME_SIZE,
+    )
+    # No pause in the last 130 s: forced cut within a frame of the maximum
+    assert MAX_SHARD_SIZE <= len(second) < MAX_SHARD_SIZE + FRAME_SIZE
+    assert len(first) + len(second) + len(rest) == len(PCM)
+
+
+@pytest.mark.parametrize("chunk_size", [1001, 4097, 96_001])
+def test_chunk_size_does_not_change_shards(chunk_size: int) -> None:
+    assert split(PCM, chunk_size) == split(PCM, 1 << 15)
+
+
+def test_short_and_empty_streams() -> None:
+    short = speech(10) + pause(1) + speech(5)
+    assert split(short, 1 << 15) == [short]
+    assert split(b"", 1 << 15) == []
+
+
+def test_reader_error_is_raised_and_stops_source(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(core, "recognize", lambda pcm, _model: str(len(pcm)))
+    stops = []
+
+    def read(chunks: Queue) -> None:
+        for _ in range(3):
+            chunks.put(memoryview(speech(1)))
+        msg = "decoder went away"
+        raise OSError(msg)
+
+    with pytest.raises(OSError, match="decoder went away"):
+        recognize_stream(read, None, lambda: stops.append(True))
+    assert stops == [True]
+
+
+def test_reader_without_error_returns_all_shards(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(core, "recognize", lambda pcm, _model: str(len(pcm)))
+
+    def read(chunks: Queue) -> None:
+        view = memoryview(PCM)
+        for i in range(0, len(PCM), 1 << 15):
+            chunks.put(view[i : i + (1 << 15)])
+
+    text = recognize_stream(read, None)
+    assert text == " ".join(str(len(shard)) for shard in split(PCM, 1 << 15))
+
+
+def write_wav(path: Path, rate: int, channels: int, frames: int) -> Path:
+    """Write a silent 16-bit PCM WAV file."""
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(SAMPLE_WIDTH)
+        wf.setframerate(rate)
+        wf.writeframes(bytes(frames * channels * SAMPLE_WIDTH))
+    return path
+
+
+def test_native_wav_is_read_in_place(tmp_path: Path) -> None:
+    path = write_wav(tmp_path / "a.wav", SAMPLE_RATE, 1, 1000)
+    assert find_pcm_data(path) == (44, 2000)
+
+
+@pytest.mark.parametrize(("rate", "channels"), [(44100, 1), (SAMPLE_RATE, 2)])
+def test_other_wav_formats_go_through_ffmpeg(
+    tmp_path: Path,
+    rate: int,
+    channels: int,
+) -> None:
+    path = write_wav(tmp_path / "a.wav", rate, channels, 1000)
+    assert find_pcm_data(path) is None
+
+
+def test_non_wav_suffix_goes_through_ffmpeg(tmp_path: Path) -> None:
+    path = write_wav(tmp_path / "a.wav", SAMPLE_RATE, 1, 1000)
+    assert find_pcm_data(path.rename(tmp_path / "a.mp3")) is None
+
+
+def test_truncated_wav_goes_through_ffmpeg(tmp_path: Path) -> None:
+    path = write_wav(tmp_path / "a.wav", SAMPLE_RATE, 1, 1000)
+    path.write_bytes(path.read_bytes()[:30])
+    assert find_pcm_data(path) is None
+
+
+def test_zero_data_size_uses_file_length(tmp_path: Path) -> None:
+    path = write_wav(tmp_path / "a.wav", SAMPLE_RATE, 1, 1000)
+    header = bytearray(path.read_bytes())
+    header[40:44] = bytes(4)
+    path.write_bytes(header)
+    assert find_pcm_data(path) == (44, 2000)
+
+
+def test_cancel_stops_source_and_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(core, "recognize", lambda pcm, _model: str(len(pcm)))
+    cancel = Event()
+    cancel.set()
+    stops = []
+
+    def read(chunks: Queue) -> None:
+        view = memoryview(PCM)
+        for i in range(0, len(PCM), 1 << 15):
+            chunks.put(view[i : i + (1 << 15)])
+
+    with pytest.raises(CancelledError):
+        recognize_stream(read, None, lambda: stops.append(True), cancel)
+    assert stops == [True]
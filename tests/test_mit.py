@@ -0,0 +1,22 @@
+"""Tests for the GUI helpers in mit."""
+
+from pathlib import Path
+
+from mit import VideoToTextConverter
+
+
+def test_output_paths_keep_suffix_only_on_clashes(tmp_path: Path) -> None:
+    files = [tmp_path / "talk.mp4", tmp_path / "talk.wav", tmp_path / "other.mp3"]
+    assert VideoToTextConverter.output_paths(files) == {
+        tmp_path / "talk.mp4": tmp_path / "talk.mp4.txt",
+        tmp_path / "talk.wav": tmp_path / "talk.wav.txt",
+        tmp_path / "other.mp3": tmp_path / "other.txt",
+    }
+
+
+def test_same_stem_in_other_folders_does_not_clash(tmp_path: Path) -> None:
+    files = [tmp_path / "a" / "talk.mp4", tmp_path / "b" / "talk.wav"]
+    assert list(VideoToTextConverter.output_paths(files).values()) == [
+        tmp_path / "a" / "talk.txt",
+        tmp_path / "b" / "talk.txt",
+    ]